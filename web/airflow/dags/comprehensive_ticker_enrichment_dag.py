@@ -25,7 +25,7 @@ This runs weekly to keep all enrichment data fresh in the background!
 """
 
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import logging
 import sys
 import os
@@ -43,7 +43,8 @@ sys.path.append('/opt/airflow/dags/airflow/scripts')
 from comprehensive_enrichment import (
     get_enrichment_manager,
     test_comprehensive_connection,
-    process_comprehensive_batch
+    process_comprehensive_batch,
+    get_batch_size
 )
 
 logger = logging.getLogger(__name__)
@@ -142,7 +143,7 @@ def validate_system_readiness(**context) -> Dict[str, bool]:
     return checks
 
 
-def identify_comprehensive_targets(**context) -> List[str]:
+def identify_comprehensive_targets(**context) -> List[Tuple[str, str]]:
     """Identify tickers for comprehensive background enrichment."""
     logger.info("🎯 Identifying tickers for comprehensive enrichment...")
     
@@ -165,7 +166,7 @@ def identify_comprehensive_targets(**context) -> List[str]:
     logger.info(f"📅 Found {len(stale_tickers)} tickers needing comprehensive enrichment")
     
     # Log sample for monitoring
-    sample_tickers = stale_tickers[:10] if len(stale_tickers) > 10 else stale_tickers
+    sample_tickers = [symbol for symbol, _ in stale_tickers[:10]]
     logger.info(f"Sample targets: {', '.join(sample_tickers)}")
     
     # Push for downstream tasks
@@ -195,17 +196,18 @@ def execute_comprehensive_enrichment(**context) -> Dict[str, Any]:
     
     # Process in batches
     total_stats = {'processed': 0, 'updated': 0, 'errors': 0, 'high_quality': 0}
-    max_batches = 8  # Process up to 8 batches (400 tickers) per run
+    max_batches = 8  # Process up to 8 batches per run
     batch_count = 0
+    batch_size = get_batch_size()
     
-    logger.info(f"🔄 Processing up to {max_batches} batches of 50 tickers each (400 per run)")
+    logger.info(f"🔄 Processing up to {max_batches} batches of {batch_size} tickers each ({max_batches * batch_size} per run)")
     
     while batch_count < max_batches:
         batch_count += 1
         logger.info(f"🔄 Executing batch {batch_count}/{max_batches}...")
         
         # Process batch with rate-limited size
-        batch_stats = process_comprehensive_batch(batch_size=50)
+        batch_stats = process_comprehensive_batch(batch_size=batch_size)
         
         # Accumulate stats
         total_stats['processed'] += batch_stats.get('processed', 0)
@@ -1,28 +1,46 @@
 """Handler for CSE listings in the airflow DAG."""
 
-import json
 import os
 from pathlib import Path
 from datetime import datetime
+import orjson
 import psycopg2
-from psycopg2.extras import execute_batch
+from psycopg2.extras import execute_values
 
 
-def process_cse_listings(**context):
-    """Process CSE listings using the external extractor."""
-    try:
-        # Import the extractor from the scripts directory (built into image)
-        import sys
+def _load_extractor():
+    """Import the extractor from the scripts directory (built into image)."""
+    import sys
+
+    # Add scripts directory to Python path (built into Docker image)
+    scripts_path = "/opt/airflow/dags/airflow/scripts"
+    if scripts_path not in sys.path:
+        sys.path.append(scripts_path)
+
+    import cse_extractor
+
+    return cse_extractor
 
-        # Add scripts directory to Python path (built into Docker image)
-        scripts_path = "/opt/airflow/dags/airflow/scripts"
-        if scripts_path not in sys.path:
-            sys.path.append(scripts_path)
 
-        from cse_extractor import extract_cse_listings
+def download_cse_xlsx(**context):
+    """Download the CSE XLSX export; the returned path is pushed to XCom."""
+    return str(_load_extractor().download_cse_xlsx())
+
+
+def process_cse_listings(xlsx_path=None, **context):
+    """Process CSE listings using the external extractor.
+
+    When ``xlsx_path`` is given (from the download task's XCom) only the
+    already-downloaded file is parsed, so retries don't relaunch the browser.
+    """
+    try:
+        extractor = _load_extractor()
 
         # Get listings from CSE
-        listings = extract_cse_listings()
+        if xlsx_path:
+            listings = extractor.parse_cse_xlsx(xlsx_path)
+        else:
+            listings = extractor.extract_cse_listings()
 
         if not listings:
             raise ValueError("No listings were extracted")
@@ -48,9 +66,7 @@ def process_cse_listings(**context):
                 insert_query = """
                     INSERT INTO stocks_listing 
                         (exchange, symbol, name, listing_url, scraped_at, status, active, status_date, asset_type)
-                    VALUES 
-                        (%(exchange)s, %(symbol)s, %(name)s, %(listing_url)s, %(scraped_at)s, 
-                         %(status)s, %(active)s, %(status_date)s, 'STOCK')
+                    VALUES %s
                     ON CONFLICT (exchange, symbol) DO UPDATE SET
                         name = EXCLUDED.name,
                         listing_url = EXCLUDED.listing_url,
@@ -61,8 +77,18 @@ def process_cse_listings(**context):
                         asset_type = 'STOCK'
                 """
 
-                # Execute batch insert/update
-                execute_batch(cur, insert_query, listings)
+                # Multi-row VALUES upsert; one statement can't touch the same
+                # row twice, so this relies on the extractor de-duplicating symbols
+                execute_values(
+                    cur,
+                    insert_query,
+                    listings,
+                    template="""(
+                        %(exchange)s, %(symbol)s, %(name)s, %(listing_url)s, %(scraped_at)s,
+                        %(status)s, %(active)s, %(status_date)s, 'STOCK'
+                    )""",
+                    page_size=1000,
+                )
 
                 # Commit the transaction
                 conn.commit()
@@ -79,8 +105,7 @@ def process_cse_listings(**context):
         output_dir.mkdir(parents=True, exist_ok=True)
 
         output_file = output_dir / f"cse_listings_{date_str}.json"
-        with open(output_file, "w") as f:
-            json.dump(listings, f, indent=2)
+        output_file.write_bytes(orjson.dumps(listings))
 
         return result
 
@@ -168,24 +168,42 @@ with DAG(
 
     # CSE group (XLSX export)
     with TaskGroup(group_id='cse_group') as cse_tg:
-        def _call_cse(**context):
+        def _cse_handler():
             import sys
             from pathlib import Path
             # Add the dags directory to Python path
             dags_dir = Path(__file__).resolve().parent
             if str(dags_dir) not in sys.path:
                 sys.path.append(str(dags_dir))
-            from cse_handler import process_cse_listings
-            return process_cse_listings(**context)
+            import cse_handler
+            return cse_handler
 
-        PythonOperator(
+        def _download_cse(**context):
+            return _cse_handler().download_cse_xlsx(**context)
+
+        def _load_cse(xlsx_path, **context):
+            return _cse_handler().process_cse_listings(xlsx_path=xlsx_path, **context)
+
+        # Download once; parsing/loading retries reuse the file via XCom
+        cse_download = PythonOperator(
             task_id='cse_fetch_xlsx',
-            python_callable=_call_cse,
+            python_callable=_download_cse,
             retries=3,
             retry_delay=timedelta(minutes=2),
             provide_context=True,
         )
 
+        cse_load = PythonOperator(
+            task_id='cse_load_listings',
+            python_callable=_load_cse,
+            op_kwargs={'xlsx_path': "{{ ti.xcom_pull(task_ids='cse_group.cse_fetch_xlsx') }}"},
+            retries=3,
+            retry_delay=timedelta(minutes=2),
+            provide_context=True,
+        )
+
+        cse_download >> cse_load
+
     groups.append(cse_tg)
 
     summarize = PythonOperator(
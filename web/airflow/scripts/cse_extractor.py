@@ -1,7 +1,8 @@
 """CSE listing data extractor — Playwright implementation.
 
-Downloads the XLSX export from https://thecse.com/listing/listed-companies/
-by clicking the JavaScript-rendered "Export List" button.
+Downloads the XLSX export from https://thecse.com/listing/listed-companies/,
+fetching the export URL directly over HTTP when possible and otherwise
+clicking the JavaScript-rendered "Export List" button.
 
 Playwright replaces the previous Selenium + undetected-chromedriver + xvfbwrapper
 stack, providing:
@@ -13,17 +14,100 @@ stack, providing:
 Expected XLSX columns (header on row index 2):
   Company, Symbol, Industry, Indices, Currency, Trading, Tier
 """
-import asyncio
-import json
+import atexit
 import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urljoin
 
+import orjson
 import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 
+# Rust-backed XLSX reader; openpyxl is the fallback engine
+try:
+    import python_calamine  # noqa: F401
+
+    _EXCEL_ENGINE = "calamine"
+except ImportError:
+    _EXCEL_ENGINE = "openpyxl"
+
 CSE_URL = "https://thecse.com/listing/listed-companies/"
+CSE_XLSX_URL = os.getenv(
+    "CSE_XLSX_URL", "https://thecse.com/listing/listed-companies/export-listings/xlsx"
+)
 DOWNLOAD_DIR = Path(os.getenv("CSE_DOWNLOAD_DIR", "/opt/airflow/data/cse/downloads"))
+_BROWSER_DOWNLOADS_DIR = DOWNLOAD_DIR / ".playwright"
+# ETag/Last-Modified of the last direct download, for conditional GETs
+_EXPORT_META_PATH = DOWNLOAD_DIR / "export_meta.json"
+
+# How long today's parsed listings are served from the JSON cache
+LISTINGS_CACHE_TTL_SECONDS = int(os.getenv("CSE_LISTINGS_CACHE_TTL", str(6 * 3600)))
+
+# Relaunch the shared browser after this many downloads to cap memory growth
+BROWSER_RECYCLE_AFTER = int(os.getenv("CSE_BROWSER_RECYCLE_AFTER", "100"))
+
+# Playwright already handles headless mode and window size; only pass the
+# container flags plus the one that hides navigator.webdriver from bot checks
+_BROWSER_ARGS = (
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-blink-features=AutomationControlled",
+)
+
+_browser_local = threading.local()
+
+# Browser downloads are retried with exponential backoff (1s, 2s, ...)
+BROWSER_DOWNLOAD_ATTEMPTS = 3
+
+# Transient HTTP failures are retried inside requests instead of falling back
+# to a full browser round; the last response is returned rather than raised
+_HTTP_RETRY = Retry(
+    total=5,
+    backoff_factor=1.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=("GET",),
+    raise_on_status=False,
+)
+
+# Background HTTP downloads that overlap with browser teardown
+_DOWNLOAD_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cse-download")
+
+# Default wait for Playwright actions without an explicit timeout (30s otherwise)
+_ACTION_TIMEOUT_MS = 10_000
+
+# Mimic a real browser user-agent to avoid basic bot detection
+_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0.0.0 Safari/537.36"
+)
+
+# XLSX files are ZIP archives; anything else is a challenge/error page
+_XLSX_MAGIC = b"PK"
+
+# Only these export columns are used; text columns stay strings so symbols
+# like "0123" are not coerced to numbers
+_XLSX_COLUMNS = frozenset({"Symbol", "Company", "Trading"})
+_XLSX_DTYPES = {"Symbol": str, "Company": str}
+
+# Resources irrelevant to reaching the export button. Stylesheets are kept
+# because element visibility (and the export dropdown) depends on them.
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+_BLOCKED_URL_PATTERNS = (
+    "google-analytics",
+    "googletagmanager",
+    "doubleclick",
+    "facebook",
+)
 
 # Selectors for the export UI — ordered most-specific first
 _EXPORT_BUTTON_SELECTORS = [
@@ -39,151 +123,444 @@ _XLSX_LINK_SELECTORS = [
     "[role='menuitem']:has-text('XLSX')",
 ]
 
+# Each list joined once into a single CSS selector list (one query per poll)
+_EXPORT_BUTTON_SELECTOR = ", ".join(_EXPORT_BUTTON_SELECTORS)
+_XLSX_LINK_SELECTOR = ", ".join(_XLSX_LINK_SELECTORS)
+
 
 def _parse_xlsx(xlsx_path: Path) -> list[dict]:
     """Parse the downloaded XLSX and return a list of listing dicts."""
-    df = pd.read_excel(xlsx_path, header=2)  # Header is on row index 2 (3rd row)
-
-    listings = []
-    for _, row in df.iterrows():
-        symbol = str(row.get("Symbol", "")).strip()
-        name = str(row.get("Company", "")).strip()
-
-        if not symbol or not name or symbol.lower() == "nan" or name.lower() == "nan":
-            continue
-
-        trading_date = None
-        trading_raw = row.get("Trading", "")
-        if pd.notna(trading_raw):
-            try:
-                if hasattr(trading_raw, "date"):
-                    trading_date = trading_raw.date().isoformat()
-                else:
-                    trading_date = pd.to_datetime(str(trading_raw)).date().isoformat()
-            except Exception:
-                trading_date = None
-
-        listings.append({
-            "exchange": "CSE",
-            "symbol": symbol,
-            "name": name,
-            "listing_url": f"https://thecse.com/en/listings/{symbol}",
-            "scraped_at": datetime.now().isoformat(),
-            "status": "listed",
-            "active": True,
-            "status_date": trading_date or datetime.now().date().isoformat(),
-        })
+    df = pd.read_excel(
+        xlsx_path,
+        header=2,  # Header is on row index 2 (3rd row)
+        engine=_EXCEL_ENGINE,
+        usecols=lambda column: column in _XLSX_COLUMNS,
+        dtype=_XLSX_DTYPES,
+    )
+    return _listings_from_frame(df)
+
+
+def _listings_from_frame(df: pd.DataFrame) -> list[dict]:
+    """Build listing dicts from the export's columns with vectorized ops."""
+    now = datetime.now()
+
+    empty = pd.Series("", index=df.index)
+    symbol = df.get("Symbol", empty).fillna("").astype(str).str.strip()
+    name = df.get("Company", empty).fillna("").astype(str).str.strip()
+    keep = (
+        symbol.ne("")
+        & name.ne("")
+        & symbol.str.lower().ne("nan")
+        & name.str.lower().ne("nan")
+    )
+    symbol = symbol[keep]
+
+    # The export occasionally repeats a symbol; keep its last row so the
+    # (exchange, symbol) upsert sees each listing once
+    symbol = symbol[~symbol.duplicated(keep="last")]
+    rows = symbol.index
+
+    # Dates and URLs are only built for the surviving rows;
+    # unparseable trading dates fall back to today
+    if "Trading" in df:
+        trading_raw = df["Trading"].loc[rows]
+    else:
+        trading_raw = pd.Series(None, index=rows, dtype=object)
+    trading = pd.to_datetime(trading_raw, errors="coerce", format="mixed")
+    status_date = trading.dt.strftime("%Y-%m-%d").fillna(now.date().isoformat())
+
+    listings = pd.DataFrame({
+        "exchange": "CSE",
+        "symbol": symbol,
+        "name": name.loc[rows],
+        "listing_url": "https://thecse.com/en/listings/" + symbol,
+        "scraped_at": now.isoformat(),
+        "status": "listed",
+        "active": True,
+        "status_date": status_date,
+    })
+    return listings.to_dict("records")
+
+
+def _claim_download_path() -> Path:
+    """Atomically create and return a fresh dated XLSX path in DOWNLOAD_DIR.
+
+    O_EXCL claims each candidate name in one syscall, so concurrent runs on
+    the same day can never pick the same file.
+    """
+    date_str = datetime.now().strftime("%Y%m%d")
+    for counter in range(10_000):
+        suffix = f"_{counter}" if counter else ""
+        dest = DOWNLOAD_DIR / f"cse_listings_{date_str}{suffix}.xlsx"
+        try:
+            fd = os.open(dest, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            continue  # Already exists from an earlier run today
+        os.close(fd)
+        return dest
+    raise RuntimeError(f"No free download filename left in {DOWNLOAD_DIR}")
 
-    return listings
 
+def _load_export_meta(url: str) -> dict:
+    """Return cached validators for ``url`` if the XLSX they describe still exists."""
+    try:
+        meta = orjson.loads(_EXPORT_META_PATH.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+    if meta.get("url") != url or not Path(meta.get("path", "")).is_file():
+        return {}
+    return meta
 
-def extract_cse_listings() -> list[dict]:
-    """Download and process the CSE listings XLSX.
 
-    Returns a list of dicts with exchange/symbol/name/listing_url/etc. keys.
-    Raises on failure so the Airflow task is marked as failed rather than silently
-    returning an empty list.
-    """
-    DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+def _stream_xlsx(session: requests.Session, url: str) -> Path | None:
+    """Stream an XLSX response to a fresh dated path in DOWNLOAD_DIR.
 
-    with sync_playwright() as pw:
-        browser = pw.chromium.launch(
-            headless=True,
-            args=[
-                "--no-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-gpu",
-            ],
-        )
+    Sends the previous download's ETag/Last-Modified, so an unchanged export
+    comes back as a bodiless 304 and the earlier file is reused.
 
-        context = browser.new_context(
-            accept_downloads=True,
-            viewport={"width": 1280, "height": 900},
-            # Mimic a real browser user-agent to avoid basic bot detection
-            user_agent=(
-                "Mozilla/5.0 (X11; Linux x86_64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/124.0.0.0 Safari/537.36"
-            ),
+    Returns None when the response is an error, a bot challenge or anything
+    else that is not an XLSX file.
+    """
+    meta = _load_export_meta(url)
+    headers = {"Referer": CSE_URL}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    with session.get(url, headers=headers, stream=True, timeout=60) as resp:
+        if resp.status_code == 304 and meta:
+            print(f"CSE export unchanged, reusing {meta['path']}")
+            return Path(meta["path"])
+
+        if resp.status_code != 200:
+            print(f"Direct XLSX fetch returned HTTP {resp.status_code}")
+            return None
+
+        resp.raw.decode_content = True
+        if resp.raw.read(len(_XLSX_MAGIC)) != _XLSX_MAGIC:
+            print("Direct XLSX fetch did not return an XLSX file")
+            return None
+
+        dest = _claim_download_path()
+        try:
+            with open(dest, "wb") as f:
+                f.write(_XLSX_MAGIC)
+                shutil.copyfileobj(resp.raw, f)
+        except Exception:
+            dest.unlink(missing_ok=True)  # Don't leave a truncated file behind
+            raise
+
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+
+    if etag or last_modified:
+        # Write-then-rename so a concurrent reader never sees a torn meta file;
+        # the thread id keeps same-process downloads from sharing a temp name
+        tmp_path = _EXPORT_META_PATH.with_name(
+            f"{_EXPORT_META_PATH.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        tmp_path.write_bytes(
+            orjson.dumps({
+                "url": url,
+                "path": str(dest),
+                "etag": etag,
+                "last_modified": last_modified,
+            })
         )
+        os.replace(tmp_path, _EXPORT_META_PATH)
+
+    print(f"Saved XLSX to: {dest}")
+    return dest
+
 
-        page = context.new_page()
+def _http_session() -> requests.Session:
+    """Return a session that retries connection errors and transient HTTP statuses."""
+    session = requests.Session()
+    session.headers["User-Agent"] = _USER_AGENT
+    adapter = HTTPAdapter(max_retries=_HTTP_RETRY)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
+
+def _fetch_xlsx_direct(session: requests.Session) -> Path | None:
+    """Fetch the XLSX export over plain HTTP, skipping the browser entirely.
+
+    Returns the saved path, or None when the site answers with a bot challenge
+    or anything that is not an XLSX file, so the caller can fall back to Playwright.
+    """
+    # Common case: the export endpoint answers a single cookie-less GET
+    dest = _stream_xlsx(session, CSE_XLSX_URL)
+    if dest is not None:
+        return dest
+
+    # Otherwise load the listings page to pick up session/CSRF cookies and retry
+    session.get(CSE_URL, timeout=30)
+    return _stream_xlsx(session, CSE_XLSX_URL)
+
+
+def _fetch_xlsx_with_cookies(url: str, cookies: list[dict]) -> Path | None:
+    """Download ``url`` over HTTP using cookies captured from the browser context."""
+    with _http_session() as session:
+        for cookie in cookies:
+            session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain"),
+                path=cookie.get("path", "/"),
+            )
+        return _stream_xlsx(session, url)
+
+
+def _acquire_browser():
+    """Return this thread's shared Chromium, launching or recycling it as needed.
+
+    Playwright's sync API objects are bound to the thread that started them, so
+    the "pool" is one browser per thread; each download gets a fresh context.
+    """
+    browser = getattr(_browser_local, "browser", None)
+    if browser is not None and (
+        not browser.is_connected() or _browser_local.uses >= BROWSER_RECYCLE_AFTER
+    ):
+        _close_browser()
+        browser = None
+
+    if browser is None:
+        playwright = sync_playwright().start()
         try:
-            print(f"Loading {CSE_URL} ...")
-            page.goto(CSE_URL, wait_until="networkidle", timeout=60_000)
-
-            # --- Click the "Export List" button ---
-            export_btn = None
-            for selector in _EXPORT_BUTTON_SELECTORS:
-                try:
-                    page.wait_for_selector(selector, state="visible", timeout=15_000)
-                    export_btn = page.locator(selector).first
-                    print(f"Found export button via: {selector}")
-                    break
-                except PlaywrightTimeoutError:
-                    continue
-
-            if export_btn is None:
+            browser = playwright.chromium.launch(
+                headless=True,
+                args=_BROWSER_ARGS,
+                # Keep download artifacts on the same filesystem as DOWNLOAD_DIR
+                # so they can be renamed into place instead of copied
+                downloads_path=str(_BROWSER_DOWNLOADS_DIR),
+            )
+        except Exception:
+            playwright.stop()
+            raise
+        _browser_local.playwright = playwright
+        _browser_local.browser = browser
+        _browser_local.uses = 0
+
+    _browser_local.uses += 1
+    return browser
+
+
+def _close_browser() -> None:
+    """Shut down this thread's shared browser and Playwright driver, if running."""
+    browser = getattr(_browser_local, "browser", None)
+    playwright = getattr(_browser_local, "playwright", None)
+    _browser_local.browser = _browser_local.playwright = None
+    try:
+        if browser is not None:
+            browser.close()
+    finally:
+        if playwright is not None:
+            playwright.stop()
+
+
+atexit.register(_close_browser)
+
+
+def _block_nonessential(route) -> None:
+    """Route handler that aborts images, media, fonts and tracking requests."""
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCE_TYPES or any(
+        pattern in request.url for pattern in _BLOCKED_URL_PATTERNS
+    ):
+        route.abort()
+    else:
+        route.continue_()
+
+
+def _wait_for_visible(page, selector: str, timeout: float):
+    """Wait for the first visible match of a (comma-joined) selector.
+
+    All alternatives are evaluated in one query per poll, so this returns as
+    soon as any matches instead of timing out on each in turn. Returns None
+    on timeout.
+    """
+    # Restrict to visible matches so a hidden duplicate can't win the race
+    locator = page.locator(f"{selector} >> visible=true").first
+    try:
+        locator.wait_for(state="visible", timeout=timeout)
+    except PlaywrightTimeoutError:
+        return None
+    return locator
+
+
+def _save_browser_download(download) -> Path:
+    """Wait for a Playwright download to finish and move it to a dated path."""
+    print(f"Download started: {download.suggested_filename}")
+
+    # failure() resolves when the browser reports the download finished
+    failure = download.failure()
+    if failure:
+        raise RuntimeError(f"CSE XLSX download failed: {failure}")
+
+    # Save to our download directory with a dated filename
+    dest = _claim_download_path()
+    try:
+        try:
+            os.replace(download.path(), dest)
+        except OSError:
+            download.save_as(str(dest))  # Artifact on another filesystem
+    except Exception:
+        dest.unlink(missing_ok=True)
+        raise
+    print(f"Saved XLSX to: {dest}")
+    return dest
+
+
+def _download_xlsx_browser(use_href: bool = True) -> Path:
+    """Download the XLSX export by driving the page with headless Chromium.
+
+    When the XLSX menu item exposes an href, the file is fetched over HTTP on a
+    background thread (with the page's cookies) while the browser context is
+    torn down; if that fetch is rejected, the page is driven again and the
+    menu item clicked instead (``use_href=False``).
+    """
+    browser = _acquire_browser()
+    http_download = None
+    context = browser.new_context(
+        accept_downloads=True,
+        viewport={"width": 1280, "height": 900},
+        user_agent=_USER_AGENT,
+    )
+    context.route("**/*", _block_nonessential)
+    # Bound implicit actionability waits (clicks, scrolls, attribute reads);
+    # steps that need longer pass an explicit timeout
+    context.set_default_timeout(_ACTION_TIMEOUT_MS)
+
+    page = context.new_page()
+
+    try:
+        print(f"Loading {CSE_URL} ...")
+        # The export button wait below covers JS rendering, so don't block on
+        # network idle (analytics beacons can keep it busy for many seconds)
+        page.goto(CSE_URL, wait_until="domcontentloaded", timeout=60_000)
+
+        # --- Click the "Export List" button ---
+        export_btn = _wait_for_visible(page, _EXPORT_BUTTON_SELECTOR, timeout=30_000)
+        if export_btn is None:
+            raise RuntimeError(
+                "Could not locate the Export List button on the CSE page. "
+                "The page structure may have changed."
+            )
+
+        export_btn.click()  # click() scrolls into view and waits for actionability
+        print("Clicked Export List button")
+
+        # --- Wait for the dropdown and click the XLSX option ---
+        # Use expect_download so Playwright intercepts the file before it hits disk
+        xlsx_locator = _wait_for_visible(page, _XLSX_LINK_SELECTOR, timeout=10_000)
+        if xlsx_locator is None:
+            # Last resort: check if the export button href leads directly to XLSX.
+            # count() doesn't wait, so a missing link fails fast instead of
+            # stalling for the default 30s locator timeout
+            xlsx_links = page.locator("a[href*='.xlsx']")
+            href = xlsx_links.first.get_attribute("href") if xlsx_links.count() else None
+            if href:
+                print(f"Found direct XLSX href: {href}")
+                with page.expect_download(timeout=60_000) as dl_info:
+                    page.goto(href)
+            else:
                 raise RuntimeError(
-                    "Could not locate the Export List button on the CSE page. "
+                    "Could not locate the XLSX download link in the dropdown. "
                     "The page structure may have changed."
                 )
-
-            export_btn.scroll_into_view_if_needed()
-            export_btn.click()
-            print("Clicked Export List button")
-
-            # --- Wait for the dropdown and click the XLSX option ---
-            # Use expect_download so Playwright intercepts the file before it hits disk
-            xlsx_locator = None
-            for selector in _XLSX_LINK_SELECTORS:
-                try:
-                    page.wait_for_selector(selector, state="visible", timeout=10_000)
-                    xlsx_locator = page.locator(selector).first
-                    print(f"Found XLSX link via: {selector}")
-                    break
-                except PlaywrightTimeoutError:
-                    continue
-
-            if xlsx_locator is None:
-                # Last resort: check if the export button href leads directly to XLSX
-                href = page.locator("a[href*='.xlsx']").first.get_attribute("href")
-                if href:
-                    print(f"Found direct XLSX href: {href}")
-                    with page.expect_download(timeout=60_000) as dl_info:
-                        page.goto(href)
-                else:
-                    raise RuntimeError(
-                        "Could not locate the XLSX download link in the dropdown. "
-                        "The page structure may have changed."
-                    )
+        else:
+            href = xlsx_locator.get_attribute("href") if use_href else None
+            if href:
+                url = urljoin(page.url, href)
+                print(f"Fetching XLSX href in the background: {url}")
+                http_download = _DOWNLOAD_EXECUTOR.submit(
+                    _fetch_xlsx_with_cookies, url, context.cookies()
+                )
             else:
                 with page.expect_download(timeout=60_000) as dl_info:
                     xlsx_locator.click()
 
-            download = dl_info.value
-            print(f"Download started: {download.suggested_filename}")
+        if http_download is None:
+            dest = _save_browser_download(dl_info.value)
 
-            # Save to our download directory with a dated filename
-            date_str = datetime.now().strftime("%Y%m%d")
-            dest = DOWNLOAD_DIR / f"cse_listings_{date_str}.xlsx"
+    finally:
+        context.close()
 
-            # Avoid overwriting if the file already exists from an earlier run today
-            counter = 1
-            while dest.exists():
-                dest = DOWNLOAD_DIR / f"cse_listings_{date_str}_{counter}.xlsx"
-                counter += 1
+    if http_download is not None:
+        dest = http_download.result()
+        if dest is None:
+            print("Background XLSX fetch was rejected, clicking the menu item instead")
+            dest = _download_xlsx_browser(use_href=False)
 
-            download.save_as(str(dest))
-            print(f"Saved XLSX to: {dest}")
+    return dest
 
-        finally:
-            context.close()
-            browser.close()
 
-    listings = _parse_xlsx(dest)
-    print(f"Extracted {len(listings)} CSE listings from {dest.name}")
+def download_cse_xlsx() -> Path:
+    """Download the CSE listings XLSX and return its path.
+
+    Tries a direct HTTP download of the export first and only launches the
+    browser when that is blocked; browser failures are retried with backoff
+    before the last error is raised.
+    """
+    DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+    dest = None
+    try:
+        with _http_session() as session:
+            dest = _fetch_xlsx_direct(session)
+    except requests.RequestException as e:
+        print(f"Direct XLSX fetch failed: {e}")
+
+    if dest is not None:
+        return dest
+
+    print("Falling back to browser download")
+    for attempt in range(BROWSER_DOWNLOAD_ATTEMPTS):
+        try:
+            return _download_xlsx_browser()
+        except Exception as e:
+            if attempt == BROWSER_DOWNLOAD_ATTEMPTS - 1:
+                raise
+            delay = 2 ** attempt
+            print(f"Browser download failed ({e}), retrying in {delay}s")
+            time.sleep(delay)
+
+
+def parse_cse_xlsx(xlsx_path: str | Path) -> list[dict]:
+    """Parse a downloaded CSE listings XLSX into listing dicts."""
+    xlsx_path = Path(xlsx_path)
+    listings = _parse_xlsx(xlsx_path)
+    print(f"Extracted {len(listings)} CSE listings from {xlsx_path.name}")
+    return listings
+
+
+def extract_cse_listings() -> list[dict]:
+    """Download and process the CSE listings XLSX.
+
+    The export changes at most daily, so parsed listings are cached per day
+    for LISTINGS_CACHE_TTL_SECONDS; retries and backfills reuse them.
+
+    Returns a list of dicts with exchange/symbol/name/listing_url/etc. keys.
+    Raises on failure so the Airflow task is marked as failed rather than silently
+    returning an empty list.
+    """
+    cache_path = DOWNLOAD_DIR / f"cse_listings_{datetime.now():%Y%m%d}.json"
+    try:
+        if time.time() - cache_path.stat().st_mtime < LISTINGS_CACHE_TTL_SECONDS:
+            listings = orjson.loads(cache_path.read_bytes())
+            print(f"Loaded {len(listings)} CSE listings from cache {cache_path.name}")
+            return listings
+    except (OSError, orjson.JSONDecodeError):
+        pass  # No usable cache for today
+
+    listings = parse_cse_xlsx(download_cse_xlsx())
+
+    # Write-then-rename so concurrent workers never read a half-written cache
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(orjson.dumps(listings))
+    os.replace(tmp_path, cache_path)
     return listings
 
 
@@ -199,6 +576,7 @@ if __name__ == "__main__":
 
         out_file = Path(__file__).parent / "data" / "cse_listings.json"
         out_file.parent.mkdir(exist_ok=True)
-        with open(out_file, "w") as f:
-            json.dump(results, f, indent=2)
+        # Compact by default; PRETTY_JSON=1 indents for manual inspection
+        options = orjson.OPT_INDENT_2 if os.getenv("PRETTY_JSON") else 0
+        out_file.write_bytes(orjson.dumps(results, option=options))
         print(f"\nSaved to {out_file}")
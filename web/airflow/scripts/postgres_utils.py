@@ -7,13 +7,20 @@ Handles connections, change detection, and data storage.
 """
 
 import psycopg2
+import psycopg2.errors
 import psycopg2.extras
+import psycopg2.pool
+import atexit
+import csv
 import hashlib
-import json
+import io
 import logging
+import threading
+import orjson
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from contextlib import contextmanager
+from psycopg2.extras import Json
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +28,97 @@ logger = logging.getLogger(__name__)
 import os
 
 
+# Connections are reused across calls instead of reconnecting per query
+DB_POOL_MIN_CONNECTIONS = 2
+DB_POOL_MAX_CONNECTIONS = 16
+
+# Rows fetched per round-trip when reading ticker lists from a server-side cursor
+TICKER_STREAM_ITERSIZE = 10000
+
+# Pools shared by every manager in the process, keyed by connection params
+_POOLS: Dict[tuple, psycopg2.pool.ThreadedConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def close_connection_pools() -> None:
+    """Close every shared connection pool (registered at exit)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.closeall()
+
+
+atexit.register(close_connection_pools)
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize JSON column values with orjson (used by the Json adapter)."""
+    return orjson.dumps(obj).decode()
+
+
+# Fields that define a ticker version for change detection, with their defaults.
+# Kept in sorted order: the hash must match EnrichedTickerData.calculate_data_hash.
+HASH_FIELD_DEFAULTS = (
+    ("asset_type", "OTHER"),
+    ("country", None),
+    ("currency", None),
+    ("industry", None),
+    ("is_active", True),
+    ("market_cap", None),
+    ("region", None),
+    ("sector", None),
+)
+
+# Columns written for each ticker version, with the defaults used when missing
+TICKER_COLUMN_DEFAULTS = {
+    "symbol": None,
+    "company_name": None,
+    "exchange": None,
+    "asset_type": "OTHER",
+    "asset_confidence": 0.0,
+    "sector": None,
+    "industry": None,
+    "sector_key": None,
+    "industry_key": None,
+    "country": None,
+    "country_code": None,
+    "region": None,
+    "market_cap": None,
+    "currency": None,
+    "is_active": True,
+    "data_source": "airflow_dag",
+    "data_quality_score": 0.0,
+    "fetch_success": True,
+    "fetch_errors": None,
+    "data_hash": None,
+}
+
+# Parameter types for the prepared upsert, in TICKER_COLUMN_DEFAULTS order
+TICKER_COLUMN_TYPES = {
+    "symbol": "text",
+    "company_name": "text",
+    "exchange": "text",
+    "asset_type": "text",
+    "asset_confidence": "float8",
+    "sector": "text",
+    "industry": "text",
+    "sector_key": "text",
+    "industry_key": "text",
+    "country": "text",
+    "country_code": "text",
+    "region": "text",
+    "market_cap": "bigint",
+    "currency": "text",
+    "is_active": "boolean",
+    "data_source": "text",
+    "data_quality_score": "float8",
+    "fetch_success": "boolean",
+    "fetch_errors": "jsonb",
+    "data_hash": "text",
+}
+
+
 class PostgreSQLManager:
     """Direct PostgreSQL manager for enriched ticker data operations."""
 
@@ -44,24 +142,83 @@ class PostgreSQLManager:
             "user": user,
             "password": password,
         }
+        self._pool_key = tuple(sorted(self.connection_params.items()))
+        # Connection pinned by session(), per thread
+        self._session = threading.local()
         logger.info(f"PostgreSQL Manager initialized for {database}@{host}")
 
+    def _get_pool(self) -> psycopg2.pool.ThreadedConnectionPool:
+        """Return the process-wide pool for these connection params, creating it once."""
+        pool = _POOLS.get(self._pool_key)
+        if pool is None:
+            with _POOLS_LOCK:
+                pool = _POOLS.get(self._pool_key)
+                if pool is None:
+                    pool = psycopg2.pool.ThreadedConnectionPool(
+                        DB_POOL_MIN_CONNECTIONS,
+                        DB_POOL_MAX_CONNECTIONS,
+                        **self.connection_params,
+                    )
+                    _POOLS[self._pool_key] = pool
+        return pool
+
+    @contextmanager
+    def session(self):
+        """Pin one pooled connection for every call made inside the block.
+
+        Useful for health checks and other tasks that run several queries in a
+        row, e.g. ``with manager.session(): manager.get_enrichment_stats()``.
+        """
+        if getattr(self._session, "conn", None) is not None:
+            yield self  # Already inside a session
+            return
+
+        with self.get_connection() as conn:
+            self._session.conn = conn
+            try:
+                yield self
+            finally:
+                self._session.conn = None
+
     @contextmanager
     def get_connection(self):
-        """Context manager for PostgreSQL connections."""
+        """Context manager that borrows a pooled PostgreSQL connection."""
+        active = getattr(self._session, "conn", None)
+        if active is not None:
+            try:
+                yield active
+            except Exception:
+                if not active.closed:
+                    active.rollback()
+                raise
+            return
+
+        pool = None
         conn = None
         try:
-            conn = psycopg2.connect(**self.connection_params)
+            pool = self._get_pool()
+            conn = pool.getconn()
             conn.autocommit = False
             yield conn
         except Exception as e:
-            if conn:
+            if conn and not conn.closed:
                 conn.rollback()
             logger.error(f"PostgreSQL connection error: {e}")
             raise
         finally:
             if conn:
-                conn.close()
+                # The pool rolls back any open transaction before reuse
+                pool.putconn(conn, close=bool(conn.closed))
+
+    def close(self) -> None:
+        """Close the shared pool for this manager's database.
+
+        Only needed at worker/task teardown; the pool is also closed at exit.
+        """
+        with _POOLS_LOCK:
+            pool = _POOLS.pop(self._pool_key, None)
+        if pool is not None:
+            pool.closeall()
 
     def test_connection(self) -> bool:
         """Test the PostgreSQL connection."""
@@ -88,9 +245,13 @@ class PostgreSQLManager:
 
         try:
             with self.get_connection() as conn:
-                with conn.cursor() as cur:
+                # Server-side cursor: rows arrive in itersize chunks instead of
+                # one client-side result set; the list is complete before the
+                # connection goes back to the pool
+                with conn.cursor(name="all_tickers") as cur:
+                    cur.itersize = TICKER_STREAM_ITERSIZE
                     cur.execute(query)
-                    tickers = [row[0].upper() for row in cur.fetchall()]
+                    tickers = [row[0].upper() for row in cur]
                     logger.info(f"📊 Found {len(tickers)} unique tickers")
                     return tickers
         except Exception as e:
@@ -99,25 +260,28 @@ class PostgreSQLManager:
 
     def get_stale_tickers(self, days: int = 7) -> List[str]:
         """Get tickers that need refreshing (stale or missing data)."""
+        # Anti-join: a listing is stale unless some version was checked
+        # successfully inside the window (missing, never checked, old and
+        # failed rows all fail this probe), served by idx_etd_fresh_ok
         query = """
         SELECT DISTINCT l.symbol
         FROM stocks_listing l
-        LEFT JOIN enriched_ticker_data e ON UPPER(l.symbol) = UPPER(e.symbol)
         WHERE l.symbol IS NOT NULL
-        AND (
-            e.symbol IS NULL  -- No enriched data exists
-            OR e.last_checked_at IS NULL  -- Never checked
-            OR e.last_checked_at < NOW() - INTERVAL '%s days'  -- Stale data
-            OR e.fetch_success = FALSE  -- Previous failure
+        AND NOT EXISTS (
+            SELECT 1 FROM enriched_ticker_data e
+            WHERE e.symbol = UPPER(l.symbol)
+            AND e.fetch_success
+            AND e.last_checked_at >= NOW() - make_interval(days => %s)
         )
         ORDER BY l.symbol
         """
 
         try:
             with self.get_connection() as conn:
-                with conn.cursor() as cur:
+                with conn.cursor(name="stale_tickers") as cur:
+                    cur.itersize = TICKER_STREAM_ITERSIZE
                     cur.execute(query, (days,))
-                    stale_tickers = [row[0].upper() for row in cur.fetchall()]
+                    stale_tickers = [row[0].upper() for row in cur]
                     logger.info(f"📅 Found {len(stale_tickers)} stale tickers")
                     return stale_tickers
         except Exception as e:
@@ -126,30 +290,19 @@ class PostgreSQLManager:
 
     def calculate_data_hash(self, data: Dict[str, Any]) -> str:
         """Calculate hash of key data fields for change detection."""
-        # Include all the fields that matter for change detection
-        key_data = {
-            "asset_type": data.get("asset_type", "OTHER"),
-            "sector": data.get("sector"),
-            "industry": data.get("industry"),
-            "country": data.get("country"),
-            "region": data.get("region"),
-            "market_cap": data.get("market_cap"),
-            "currency": data.get("currency"),
-            "is_active": data.get("is_active", True),
-        }
-
-        # Convert to sorted string representation for consistent hashing
-        data_str = str(sorted(key_data.items()))
-        return hashlib.sha256(data_str.encode()).hexdigest()
+        # Same encoding as EnrichedTickerData.calculate_data_hash, so rows written
+        # by either side compare equal: str() of the (field, value) pairs sorted
+        key_items = [(field, data.get(field, default)) for field, default in HASH_FIELD_DEFAULTS]
+        return hashlib.sha256(str(key_items).encode()).hexdigest()
 
     def get_latest_ticker_data(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Get the latest version of data for a ticker."""
         query = """
         SELECT symbol, version, asset_type, sector, industry, country, region,
-               market_cap, currency, is_active, data_hash, last_checked_at,
-               data_changed_at, fetch_success
+               market_cap, currency, is_active, data_hash, first_loaded_at,
+               last_checked_at, data_changed_at, fetch_success
         FROM enriched_ticker_data
-        WHERE UPPER(symbol) = UPPER(%s)
+        WHERE symbol = %s
         ORDER BY version DESC
         LIMIT 1
         """
@@ -157,7 +310,7 @@ class PostgreSQLManager:
         try:
             with self.get_connection() as conn:
                 with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                    cur.execute(query, (symbol,))
+                    cur.execute(query, (symbol.upper(),))
                     row = cur.fetchone()
 
                     if row:
@@ -168,15 +321,6 @@ class PostgreSQLManager:
             logger.error(f"Error fetching latest data for {symbol}: {e}")
             return None
 
-    def has_data_changed(self, symbol: str, new_data: Dict[str, Any]) -> bool:
-        """Check if new data is different from the latest version."""
-        latest = self.get_latest_ticker_data(symbol)
-        if not latest:
-            return True  # No existing data, so it's "changed"
-
-        new_hash = self.calculate_data_hash(new_data)
-        return latest["data_hash"] != new_hash
-
     def create_or_update_ticker_data(
         self, symbol: str, data: Dict[str, Any]
     ) -> Tuple[bool, int]:
@@ -188,134 +332,280 @@ class PostgreSQLManager:
         """
         symbol = symbol.upper()
 
-        if not self.has_data_changed(symbol, data):
-            # Data hasn't changed, just update the last_checked_at timestamp
-            self._update_last_checked(symbol)
-            latest = self.get_latest_ticker_data(symbol)
-            return False, latest["version"] if latest else 1
-
-        # Data has changed, create new version
-        return self._create_new_version(symbol, data)
-
-    def _update_last_checked(self, symbol: str):
-        """Update the last_checked_at timestamp for existing record."""
-        query = """
-        UPDATE enriched_ticker_data 
-        SET last_checked_at = NOW()
-        WHERE UPPER(symbol) = UPPER(%s) 
-        AND version = (
-            SELECT MAX(version) 
-            FROM enriched_ticker_data 
-            WHERE UPPER(symbol) = UPPER(%s)
-        )
-        """
-
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(query, (symbol, symbol))
+                    data_changed, version = self._upsert_ticker(conn, cur, symbol, data)
                     conn.commit()
-                    logger.debug(f"🔄 Updated timestamp for {symbol}")
-
         except Exception as e:
-            logger.error(f"Error updating timestamp for {symbol}: {e}")
+            logger.error(f"Error writing ticker data for {symbol}: {e}")
             raise
 
-    def _create_new_version(
-        self, symbol: str, data: Dict[str, Any]
-    ) -> Tuple[bool, int]:
-        """Create a new version of ticker data."""
-        latest = self.get_latest_ticker_data(symbol)
-        new_version = (latest["version"] + 1) if latest else 1
-
-        insert_query = """
-        INSERT INTO enriched_ticker_data (
-            symbol, version, company_name, exchange, asset_type, asset_confidence,
-            sector, industry, sector_key, industry_key, country, country_code, region,
-            market_cap, currency, is_active, data_source, data_quality_score,
-            fetch_success, fetch_errors, data_hash, data_changed_at, first_loaded_at,
-            last_updated_at, last_checked_at
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-            NOW(), 
-            CASE WHEN %s = 1 THEN NOW() ELSE (
-                SELECT first_loaded_at FROM enriched_ticker_data 
-                WHERE UPPER(symbol) = UPPER(%s) LIMIT 1
-            ) END,
-            NOW(), NOW()
+        if data_changed:
+            logger.info(f"✅ Created new version {version} for {symbol}")
+        else:
+            logger.debug(f"🔄 Updated timestamp for {symbol}")
+        return data_changed, version
+
+    def _upsert_statement(self) -> Tuple[str, str]:
+        """Return (arg_types, sql) for the prepared single-ticker upsert."""
+        columns = list(TICKER_COLUMN_DEFAULTS)
+        column_list = ", ".join(columns)
+        placeholders = {column: f"${i}" for i, column in enumerate(columns, 1)}
+        value_list = ", ".join(placeholders.values())
+        arg_types = f"({', '.join(TICKER_COLUMN_TYPES[column] for column in columns)})"
+        symbol_arg = placeholders["symbol"]
+        hash_arg = placeholders["data_hash"]
+
+        # One round-trip: read the latest version once, then either touch it
+        # (hash unchanged) or insert the next version carrying first_loaded_at
+        upsert_query = f"""
+        WITH latest AS (
+            SELECT version, data_hash, first_loaded_at FROM enriched_ticker_data
+            WHERE symbol = {symbol_arg}
+            ORDER BY version DESC LIMIT 1
+        ), touched AS (
+            UPDATE enriched_ticker_data
+            SET last_checked_at = NOW()
+            WHERE symbol = {symbol_arg}
+            AND version = (SELECT version FROM latest)
+            AND (SELECT data_hash FROM latest) = {hash_arg}
+            RETURNING version
+        ), inserted AS (
+            INSERT INTO enriched_ticker_data (
+                {column_list}, version, data_changed_at, first_loaded_at,
+                last_updated_at, last_checked_at
+            )
+            SELECT
+                {value_list}, COALESCE((SELECT version FROM latest), 0) + 1, NOW(),
+                COALESCE((SELECT first_loaded_at FROM latest), NOW()), NOW(), NOW()
+            WHERE (SELECT data_hash FROM latest) IS DISTINCT FROM {hash_arg}
+            RETURNING version
         )
+        SELECT TRUE, version FROM inserted
+        UNION ALL
+        SELECT FALSE, version FROM touched
         """
+        return arg_types, upsert_query
 
-        # Calculate data hash
-        data_hash = self.calculate_data_hash(data)
-
-        # Prepare insert values
-        values = (
-            symbol.upper(),  # symbol
-            new_version,  # version
-            data.get("company_name"),  # company_name
-            data.get("exchange"),  # exchange
-            data.get("asset_type", "OTHER"),  # asset_type
-            data.get("asset_confidence", 0.0),  # asset_confidence
-            data.get("sector"),  # sector
-            data.get("industry"),  # industry
-            data.get("sector_key"),  # sector_key
-            data.get("industry_key"),  # industry_key
-            data.get("country"),  # country
-            data.get("country_code"),  # country_code
-            data.get("region"),  # region
-            data.get("market_cap"),  # market_cap
-            data.get("currency"),  # currency
-            data.get("is_active", True),  # is_active
-            data.get("data_source", "airflow_dag"),  # data_source
-            data.get("data_quality_score", 0.0),  # data_quality_score
-            data.get("fetch_success", True),  # fetch_success
-            json.dumps(data.get("fetch_errors")),  # fetch_errors (JSON)
-            data_hash,  # data_hash
-            new_version,  # for first_loaded_at logic
-            symbol.upper(),  # for first_loaded_at subquery
+    def _upsert_ticker(
+        self, conn, cur, symbol: str, data: Dict[str, Any]
+    ) -> Tuple[bool, int]:
+        """Run the upsert on ``cur`` without committing; returns (changed, version)."""
+        params = self._row_params(symbol, data)
+        arg_types, upsert_query = self._upsert_statement()
+        self._execute_prepared(
+            conn,
+            cur,
+            "ticker_upsert",
+            arg_types,
+            upsert_query,
+            tuple(params.values()),
         )
+        return cur.fetchone()
 
+    def _execute_prepared(
+        self,
+        conn,
+        cur,
+        name: str,
+        arg_types: str,
+        sql: str,
+        params: Tuple[Any, ...],
+    ) -> None:
+        """EXECUTE a server-side prepared statement, preparing it on first use.
+
+        Prepared statements live for the session, so each pooled connection
+        plans the query once and reuses that plan on later calls.
+        """
+        execute_sql = f"EXECUTE {name} ({', '.join(['%s'] * len(params))})"
         try:
-            with self.get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(insert_query, values)
-                    conn.commit()
-                    logger.info(f"✅ Created new version {new_version} for {symbol}")
-                    return True, new_version
-
-        except Exception as e:
-            logger.error(f"Error creating new version for {symbol}: {e}")
-            raise
+            cur.execute(execute_sql, params)
+        except psycopg2.errors.InvalidSqlStatementName:
+            conn.rollback()
+            cur.execute(f"PREPARE {name} {arg_types} AS {sql}")
+            conn.commit()
+            cur.execute(execute_sql, params)
+
+    def _ensure_prepared(self, conn, cur, name: str, arg_types: str, sql: str) -> None:
+        """PREPARE ``name`` on this connection unless it already exists."""
+        cur.execute("SELECT 1 FROM pg_prepared_statements WHERE name = %s", (name,))
+        if cur.fetchone() is None:
+            cur.execute(f"PREPARE {name} {arg_types} AS {sql}")
+        conn.commit()
+
+    def _row_params(self, symbol: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the stored column values for ``data``, filling in defaults."""
+        params = {
+            column: data.get(column, default)
+            for column, default in TICKER_COLUMN_DEFAULTS.items()
+        }
+        params["symbol"] = symbol.upper()
+        params["fetch_errors"] = Json(data.get("fetch_errors"), dumps=_json_dumps)
+        params["data_hash"] = self.calculate_data_hash(data)
+        return params
 
     def bulk_update_tickers(self, ticker_data: List[Dict[str, Any]]) -> Dict[str, int]:
         """
         Bulk update multiple tickers efficiently.
 
+        All rows are COPYed into a staging table and applied with one
+        set-based statement; if that fails the tickers are written one by one.
+
         Returns:
             Statistics dictionary with counts
         """
         stats = {"processed": 0, "created": 0, "updated": 0, "errors": 0}
 
+        # Last entry wins for duplicate symbols, as it would row by row
+        latest_by_symbol = {}
         for ticker_info in ticker_data:
-            try:
-                symbol = ticker_info["symbol"]
-                data_changed, version = self.create_or_update_ticker_data(
-                    symbol, ticker_info
-                )
+            symbol = ticker_info.get("symbol")
+            if not symbol:
+                logger.error("Error processing UNKNOWN: missing symbol")
+                stats["errors"] += 1
+                continue
+            latest_by_symbol[symbol.upper()] = ticker_info
+
+        if not latest_by_symbol:
+            return stats
+
+        try:
+            created, updated = self._copy_ticker_batch(latest_by_symbol)
+        except Exception as e:
+            logger.warning(f"⚠️ Bulk COPY failed, falling back to per-row writes: {e}")
+            return self._bulk_update_per_row(list(latest_by_symbol.values()), stats)
 
-                if data_changed:
-                    stats["created"] += 1
-                else:
-                    stats["updated"] += 1
+        stats["created"] += created
+        stats["updated"] += updated
+        stats["processed"] += created + updated
+        return stats
 
-                stats["processed"] += 1
+    def _copy_ticker_batch(
+        self, tickers: Dict[str, Dict[str, Any]]
+    ) -> Tuple[int, int]:
+        """COPY tickers into a staging table and apply them in one statement.
 
-            except Exception as e:
-                logger.error(
-                    f"Error processing {ticker_info.get('symbol', 'UNKNOWN')}: {e}"
+        Returns (created, updated): new versions inserted and unchanged
+        tickers whose last_checked_at was touched.
+        """
+        columns = list(TICKER_COLUMN_DEFAULTS)
+        column_list = ", ".join(columns)
+        staged_list = ", ".join(f"s.{column}" for column in columns[1:])
+
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for symbol, data in tickers.items():
+            row = self._row_params(symbol, data)
+            # COPY takes the JSON text itself, not the SQL literal Json renders
+            row["fetch_errors"] = _json_dumps(data.get("fetch_errors"))
+            writer.writerow(row.values())
+        buf.seek(0)
+
+        apply_query = f"""
+        WITH latest AS (
+            SELECT s.symbol, l.version, l.first_loaded_at,
+                   l.data_hash IS NOT DISTINCT FROM s.data_hash AS unchanged
+            FROM ticker_staging s
+            LEFT JOIN LATERAL (
+                SELECT version, first_loaded_at, data_hash FROM enriched_ticker_data e
+                WHERE e.symbol = s.symbol
+                ORDER BY version DESC LIMIT 1
+            ) l ON TRUE
+        ), touched AS (
+            UPDATE enriched_ticker_data e
+            SET last_checked_at = NOW()
+            FROM latest l
+            WHERE l.unchanged
+            AND e.symbol = l.symbol
+            AND e.version = l.version
+            RETURNING 1
+        ), inserted AS (
+            INSERT INTO enriched_ticker_data (
+                {column_list}, version, data_changed_at, first_loaded_at,
+                last_updated_at, last_checked_at
+            )
+            SELECT
+                s.symbol, {staged_list}, COALESCE(l.version, 0) + 1, NOW(),
+                COALESCE(l.first_loaded_at, NOW()), NOW(), NOW()
+            FROM ticker_staging s
+            JOIN latest l ON l.symbol = s.symbol
+            WHERE NOT l.unchanged
+            ON CONFLICT (symbol, version) DO NOTHING
+            RETURNING 1
+        )
+        SELECT (SELECT COUNT(*) FROM inserted), (SELECT COUNT(*) FROM touched)
+        """
+
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL synchronous_commit TO OFF")
+                cur.execute(
+                    f"""
+                    CREATE TEMP TABLE ticker_staging ON COMMIT DROP AS
+                    SELECT {column_list} FROM enriched_ticker_data WITH NO DATA
+                    """
                 )
-                stats["errors"] += 1
+                cur.copy_expert(
+                    f"COPY ticker_staging ({column_list}) FROM STDIN WITH (FORMAT CSV)",
+                    buf,
+                )
+                cur.execute(apply_query)
+                created, updated = cur.fetchone()
+                conn.commit()
+
+        logger.info(f"✅ Bulk update: {created} new versions, {updated} unchanged")
+        return created, updated
+
+    def _bulk_update_per_row(
+        self, ticker_data: List[Dict[str, Any]], stats: Dict[str, int]
+    ) -> Dict[str, int]:
+        """Apply tickers one at a time, counting failures instead of aborting.
+
+        Everything runs in one transaction with a savepoint per ticker, so a
+        bad row is rolled back on its own and the batch commits once.
+        """
+        initial = dict(stats)
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    # Prepare up front: a failed EXECUTE inside the loop would
+                    # otherwise roll back the whole batch transaction
+                    self._ensure_prepared(
+                        conn, cur, "ticker_upsert", *self._upsert_statement()
+                    )
+                    # Re-running a batch is idempotent, so don't wait on the WAL flush
+                    cur.execute("SET LOCAL synchronous_commit TO OFF")
+
+                    for ticker_info in ticker_data:
+                        cur.execute("SAVEPOINT ticker_row")
+                        try:
+                            symbol = ticker_info["symbol"].upper()
+                            data_changed, version = self._upsert_ticker(
+                                conn, cur, symbol, ticker_info
+                            )
+                            cur.execute("RELEASE SAVEPOINT ticker_row")
+
+                            if data_changed:
+                                stats["created"] += 1
+                            else:
+                                stats["updated"] += 1
+
+                            stats["processed"] += 1
+
+                        except Exception as e:
+                            cur.execute("ROLLBACK TO SAVEPOINT ticker_row")
+                            logger.error(
+                                f"Error processing {ticker_info.get('symbol', 'UNKNOWN')}: {e}"
+                            )
+                            stats["errors"] += 1
+
+                    conn.commit()
+        except Exception as e:
+            # The transaction is gone, so nothing from this batch was applied
+            logger.error(f"Error applying ticker batch: {e}")
+            stats.update(initial)
+            stats["errors"] += len(ticker_data)
 
         return stats
 
@@ -27,21 +27,22 @@ def wait_for_database(host, port, timeout=60):
         return True
     
     log(f"Waiting for database at {host}:{port}...")
-    start_time = time.time()
-    
-    while time.time() - start_time < timeout:
+    deadline = time.monotonic() + timeout
+    delay = 0.05  # Back off 50ms, 100ms, 200ms, ... capped at 1s
+
+    while time.monotonic() < deadline:
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(1)  # 1 second timeout
-                result = sock.connect_ex((host, int(port)))
-                if result == 0:
-                    log(f"✅ Database at {host}:{port} is ready!")
-                    return True
-        except (socket.error, ValueError) as e:
+            # create_connection resolves via getaddrinfo, so IPv6 hosts work too
+            remaining = max(deadline - time.monotonic(), 0.01)
+            socket.create_connection((host, int(port)), timeout=min(1.0, remaining)).close()
+            log(f"✅ Database at {host}:{port} is ready!")
+            return True
+        except (OSError, ValueError) as e:
             log(f"Database connection attempt failed: {e}", "DEBUG")
-        
-        log("Database is unavailable - sleeping for 1 second")
-        time.sleep(1)
+
+        log(f"Database is unavailable - retrying in {delay:.2f}s")
+        time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+        delay = min(delay * 2, 1.0)
     
     log(f"❌ Database at {host}:{port} failed to become ready after {timeout}s", "ERROR")
     return False
@@ -3,8 +3,14 @@ Asset Classification System
 Automatically classify stocks_listing entries into asset classes
 """
 import re
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import islice
+import pandas as pd
 import yfinance as yf
 from typing import Dict, Optional, List, Tuple
+from django.core.cache import cache
 from django.db import models, transaction
 from .models import Listing
 import logging
@@ -32,182 +38,227 @@ class AssetClassifier:
         ('OTHER', 'Other/Unknown'),
     ]
     
+    # Concurrent yfinance lookups in classify_by_api_batch (network bound)
+    API_MAX_WORKERS = 16
+    
+    # Example listings kept per asset type in classification results
+    SAMPLES_PER_TYPE = 10
+    
+    # yfinance quote types rarely change, so API results are cached for 90 days
+    API_CACHE_TIMEOUT = 90 * 24 * 3600
+    
+    etf_patterns = [
+        r'\bETF\b',  # Contains "ETF" as whole word
+        r'\bEXCHANGE.TRADED.FUND\b',
+        r'\bINDEX.FUND\b',
+        r'\bTRACKED\b',
+    ]
+    
+    reit_patterns = [
+        r'\bREIT\b',
+        r'REAL ESTATE INVESTMENT TRUST',
+        r'REAL ESTATE INCOME TRUST',
+        r'PROPERTY TRUST',
+    ]
+    
+    trust_patterns = [
+        r'\bTRUST\b',
+        r'INCOME TRUST', 
+        r'BUSINESS TRUST',
+        r'ROYALTY TRUST',
+    ]
+    
+    fund_patterns = [
+        r'\bFUND\b',
+        r'INVESTMENT FUND',
+        r'MUTUAL FUND',
+        r'POOLED FUND',
+    ]
+    
+    bond_patterns = [
+        r'\bBOND\b',
+        r'\bDEBENTURE\b',
+        r'FIXED INCOME',
+        r'GOVERNMENT BOND',
+        r'CORPORATE BOND',
+    ]
+    
+    warrant_patterns = [
+        r'\bWARRANT\b',
+        r'\.WT\b',
+        r'\.WS\b',
+    ]
+    
+    rights_patterns = [
+        r'\bRIGHTS?\b',
+        r'\.RT\b',
+        r'\.R\b',
+    ]
+    
+    preferred_patterns = [
+        r'PREFERRED',
+        r'PREFERENCE',
+        r'\.PR\.',
+        r'\.PF\.',
+    ]
+    
+    crypto_patterns = [
+        r'\bBITCOIN\b',
+        r'\bETHEREUM\b',
+        r'\bSOLANA\b', 
+        r'\bCRYPTO\b',
+        r'\bBLOCKCHAIN\b',
+    ]
+    
+    # Symbol suffix patterns for Canadian markets
+    suffix_patterns = {
+        '.UN': 'UNIT',      # Units (often REITs)
+        '.U': 'OTHER',      # USD version
+        '.DB': 'BOND',      # Debenture/Bond
+        '.WT': 'WARRANT',   # Warrant
+        '.RT': 'RIGHTS',    # Rights
+        '.PR': 'PREFERRED', # Preferred
+        '.TO': 'STOCK',     # Toronto (but this is usually not in our data)
+    }
+    
+    # Compiled name categories, built once and shared by every instance
+    _CATEGORY_RES = None
+    
+    @classmethod
+    def _build_res(cls):
+        """Return the priority-ordered (asset_type, compiled regex) table."""
+        if cls._CATEGORY_RES is None:
+            # One alternation per category, checked in priority order (ETF
+            # before FUND, REIT before TRUST). Patterns are uppercase and run
+            # case-sensitively against the uppercased name.
+            cls._CATEGORY_RES = tuple(
+                (asset_type, re.compile('|'.join(patterns)))
+                for asset_type, patterns in [
+                    ('ETF', cls.etf_patterns),
+                    ('REIT', cls.reit_patterns),
+                    ('CRYPTO', cls.crypto_patterns),
+                    ('WARRANT', cls.warrant_patterns),
+                    ('RIGHTS', cls.rights_patterns),
+                    ('PREFERRED', cls.preferred_patterns),
+                    ('BOND', cls.bond_patterns),
+                    ('MUTUAL_FUND', cls.fund_patterns),
+                    ('TRUST', cls.trust_patterns),
+                ]
+            )
+        return cls._CATEGORY_RES
+    
     def __init__(self):
         """Initialize classification rules."""
-        self.etf_patterns = [
-            r'\bETF\b',  # Contains "ETF" as whole word
-            r'\bExchange.Traded.Fund\b',
-            r'\bIndex.Fund\b',
-            r'\bTRACKED\b',
-        ]
-        
-        self.reit_patterns = [
-            r'\bREIT\b',
-            r'Real Estate Investment Trust',
-            r'Real Estate Income Trust',
-            r'Property Trust',
-        ]
-        
-        self.trust_patterns = [
-            r'\bTRUST\b',
-            r'Income Trust', 
-            r'Business Trust',
-            r'Royalty Trust',
-        ]
-        
-        self.fund_patterns = [
-            r'\bFUND\b',
-            r'Investment Fund',
-            r'Mutual Fund',
-            r'Pooled Fund',
-        ]
-        
-        self.bond_patterns = [
-            r'\bBOND\b',
-            r'\bDEBENTURE\b',
-            r'Fixed Income',
-            r'Government Bond',
-            r'Corporate Bond',
-        ]
-        
-        self.warrant_patterns = [
-            r'\bWARRANT\b',
-            r'\.WT\b',
-            r'\.WS\b',
-        ]
-        
-        self.rights_patterns = [
-            r'\bRIGHTS?\b',
-            r'\.RT\b',
-            r'\.R\b',
-        ]
-        
-        self.preferred_patterns = [
-            r'PREFERRED',
-            r'PREFERENCE',
-            r'\.PR\.',
-            r'\.PF\.',
-        ]
-        
-        self.crypto_patterns = [
-            r'\bBITCOIN\b',
-            r'\bETHEREUM\b',
-            r'\bSOLANA\b', 
-            r'\bCRYPTO\b',
-            r'\bBLOCKCHAIN\b',
-        ]
-        
-        # Symbol suffix patterns for Canadian markets
-        self.suffix_patterns = {
-            '.UN': 'UNIT',      # Units (often REITs)
-            '.U': 'OTHER',      # USD version
-            '.DB': 'BOND',      # Debenture/Bond
-            '.WT': 'WARRANT',   # Warrant
-            '.RT': 'RIGHTS',    # Rights
-            '.PR': 'PREFERRED', # Preferred
-            '.TO': 'STOCK',     # Toronto (but this is usually not in our data)
+        self._name_categories = self._build_res()
+
+        # Every suffix starts with '.', so a symbol can only match on the text
+        # after its last '.'; look that up directly ('.UN' -> 'UN')
+        self._suffix_map = {
+            suffix[1:]: asset_type for suffix, asset_type in self.suffix_patterns.items()
         }
 
+        # Listings often repeat names across exchanges and share classes
+        self._classify_name_cached = lru_cache(maxsize=4096)(self._classify_name)
+
     def classify_by_name(self, name: str) -> str:
         """Classify asset by company/fund name patterns."""
+        if not name:
+            return 'STOCK'  # Nothing to match; same as classify_frame's missing names
+        return self._classify_name_cached(name)
+
+    def _classify_name(self, name: str) -> str:
         name_upper = name.upper()
-        
-        # Check ETF patterns first (most specific)
-        for pattern in self.etf_patterns:
-            if re.search(pattern, name_upper, re.IGNORECASE):
-                return 'ETF'
-        
-        # Check REIT patterns
-        for pattern in self.reit_patterns:
-            if re.search(pattern, name_upper, re.IGNORECASE):
-                return 'REIT'
-        
-        # Check crypto patterns
-        for pattern in self.crypto_patterns:
-            if re.search(pattern, name_upper, re.IGNORECASE):
-                return 'CRYPTO'
-        
-        # Check warrant patterns
-        for pattern in self.warrant_patterns:
-            if re.search(pattern, name_upper, re.IGNORECASE):
-                return 'WARRANT'
-        
-        # Check rights patterns
-        for pattern in self.rights_patterns:
-            if re.search(pattern, name_upper, re.IGNORECASE):
-                return 'RIGHTS'
-        
-        # Check preferred patterns
-        for pattern in self.preferred_patterns:
-            if re.search(pattern, name_upper, re.IGNORECASE):
-                return 'PREFERRED'
-        
-        # Check bond patterns
-        for pattern in self.bond_patterns:
-            if re.search(pattern, name_upper, re.IGNORECASE):
-                return 'BOND'
-        
-        # Check fund patterns (after ETF to avoid conflicts)
-        for pattern in self.fund_patterns:
-            if re.search(pattern, name_upper, re.IGNORECASE):
-                return 'MUTUAL_FUND'
-        
-        # Check trust patterns (after REIT to avoid conflicts)
-        for pattern in self.trust_patterns:
-            if re.search(pattern, name_upper, re.IGNORECASE):
-                return 'TRUST'
-        
+        for asset_type, pattern in self._name_categories:
+            if pattern.search(name_upper):
+                return asset_type
+
         return 'STOCK'  # Default assumption
 
     def classify_by_symbol(self, symbol: str) -> str:
         """Classify asset by symbol patterns."""
-        symbol_upper = symbol.upper()
-        
-        # Check for suffix patterns
-        for suffix, asset_type in self.suffix_patterns.items():
-            if symbol_upper.endswith(suffix):
-                return asset_type
+        _, sep, tail = symbol.upper().rpartition('.')
+        if sep:
+            # None when the suffix is unknown: no conclusive determination
+            return self._suffix_map.get(tail)
         
-        # Special symbol patterns
-        if re.match(r'^[A-Z]{1,4}\.UN$', symbol_upper):
-            return 'UNIT'
-        
-        if re.match(r'^[A-Z]{1,4}\.WT$', symbol_upper):
-            return 'WARRANT'
-            
         return None  # No conclusive determination from symbol
 
     def classify_by_api(self, symbol: str, exchange: str) -> str:
-        """Use yfinance API to get security type (optional, slower)."""
+        """Use yfinance API to get security type (optional, slower).
+        
+        Results are cached in the Django cache; failed lookups are not cached.
+        """
+        cache_key = f"asset_classifier:api:{exchange}:{symbol}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached or None  # '' records "no mapping for this quote type"
+        
         try:
-            # Construct ticker symbol for yfinance
-            if exchange.upper() in ['TSX', 'TSXV']:
-                ticker_symbol = f"{symbol}.TO"
-            else:
-                ticker_symbol = symbol
-            
-            ticker = yf.Ticker(ticker_symbol)
-            info = ticker.info
-            
-            # yfinance security type mapping
-            security_type = info.get('quoteType', '').lower()
-            
-            if security_type == 'etf':
-                return 'ETF'
-            elif security_type == 'mutualfund':
-                return 'MUTUAL_FUND'
-            elif security_type == 'equity':
-                return 'STOCK'
-            elif security_type in ['bond', 'fixed_income']:
-                return 'BOND'
-                
+            result = self._fetch_api_classification(symbol, exchange)
         except Exception as e:
             logger.debug(f"API classification failed for {symbol}: {e}")
+            return None
+        
+        cache.set(cache_key, result or '', timeout=self.API_CACHE_TIMEOUT)
+        return result
+
+    def _fetch_api_classification(self, symbol: str, exchange: str) -> Optional[str]:
+        """Map the yfinance quoteType for a symbol to an asset type; raises on API errors."""
+        # Construct ticker symbol for yfinance
+        if exchange.upper() in ['TSX', 'TSXV']:
+            ticker_symbol = f"{symbol}.TO"
+        else:
+            ticker_symbol = symbol
+        
+        ticker = yf.Ticker(ticker_symbol)
+        
+        # fast_info reads quoteType from the chart metadata in one request,
+        # where .info assembles the full quote summary
+        security_type = (ticker.fast_info['quoteType'] or '').lower()
+        
+        if security_type == 'etf':
+            return 'ETF'
+        elif security_type == 'mutualfund':
+            return 'MUTUAL_FUND'
+        elif security_type == 'equity':
+            return 'STOCK'
+        elif security_type in ['bond', 'fixed_income']:
+            return 'BOND'
         
         return None
 
-    def classify_listing(self, listing: Listing, use_api: bool = False) -> str:
-        """Classify a single listing using multiple methods."""
+    def classify_by_api_batch(
+        self, symbols_with_exchange: List[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Optional[str]]:
+        """Run classify_by_api for many (symbol, exchange) pairs concurrently."""
+        pairs = list(dict.fromkeys(symbols_with_exchange))
+        if not pairs:
+            return {}
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(self.API_MAX_WORKERS, len(pairs))) as executor:
+            futures = {
+                executor.submit(self.classify_by_api, symbol, exchange): (symbol, exchange)
+                for symbol, exchange in pairs
+            }
+            for future in as_completed(futures):
+                # classify_by_api swallows its own errors and returns None
+                results[futures[future]] = future.result()
+        
+        return results
+
+    def _needs_api(self, listing: Listing) -> bool:
+        """Whether classify_listing would consult the API for this listing."""
+        symbol_classification = self.classify_by_symbol(listing.symbol)
+        return not symbol_classification or symbol_classification == 'OTHER'
+
+    def classify_listing(self, listing: Listing, use_api: bool = False,
+                         api_results: Optional[Dict[Tuple[str, str], Optional[str]]] = None) -> str:
+        """Classify a single listing using multiple methods.
+        
+        ``api_results`` holds prefetched classify_by_api_batch results; listings
+        missing from it are looked up individually.
+        """
         
         # Method 1: Symbol-based classification
         symbol_classification = self.classify_by_symbol(listing.symbol)
@@ -220,7 +271,11 @@ class AssetClassifier:
         # Method 3: API-based classification (optional)
         api_classification = None
         if use_api:
-            api_classification = self.classify_by_api(listing.symbol, listing.exchange)
+            key = (listing.symbol, listing.exchange)
+            if api_results is not None and key in api_results:
+                api_classification = api_results[key]
+            else:
+                api_classification = self.classify_by_api(listing.symbol, listing.exchange)
         
         # Prioritize classifications
         if api_classification:
@@ -250,47 +305,122 @@ class AssetClassifier:
 
     def classify_all_listings(self, use_api: bool = False, limit: int = None, batch_size: int = 500) -> Dict:
         
-        queryset = Listing.objects.all()
+        # Only the fields classification reads; rows are streamed in batches
+        queryset = Listing.objects.only('id', 'symbol', 'name', 'exchange', 'asset_type')
         if limit:
             queryset = queryset[:limit]
             
         results = {
             'total_processed': 0,
-            'classifications': {},
+            'counts': Counter(),
+            'samples': defaultdict(list),
             'errors': []
         }
         
-        listings_to_update = []
+        listings = queryset.iterator(chunk_size=batch_size)
         
-        for listing in queryset:
+        while chunk := list(islice(listings, batch_size)):
+            # Fetch the API results this chunk needs in parallel, before any
+            # row locks are taken
+            api_results = None
+            if use_api:
+                api_results = self.classify_by_api_batch(
+                    [(listing.symbol, listing.exchange) for listing in chunk if self._needs_api(listing)]
+                )
+            
+            listings_to_update = []
+            self._classify_chunk(chunk, results, listings_to_update, use_api, api_results)
+            
+            # One short transaction per batch, so stocks_listing rows are not
+            # locked across the network calls for later batches
+            if listings_to_update:
+                with transaction.atomic():
+                    Listing.objects.bulk_update(listings_to_update, ['asset_type'])
+
+        return results
+
+    def _classify_chunk(self, chunk: List[Listing], results: Dict, listings_to_update: List[Listing],
+                        use_api: bool, api_results: Optional[Dict]) -> None:
+        """Classify ``chunk`` in memory, recording results and listings to save."""
+        for listing in chunk:
             try:
-                asset_type = self.classify_listing(listing, use_api=use_api)
+                asset_type = self.classify_listing(listing, use_api=use_api, api_results=api_results)
                 
                 listing.asset_type = asset_type
                 listings_to_update.append(listing)
                 
-                if asset_type not in results['classifications']:
-                    results['classifications'][asset_type] = []
-                
-                results['classifications'][asset_type].append({
-                    'symbol': listing.symbol,
-                    'name': listing.name,
-                    'exchange': listing.exchange
-                })
+                results['counts'][asset_type] += 1
+                samples = results['samples'][asset_type]
+                if len(samples) < self.SAMPLES_PER_TYPE:
+                    samples.append({
+                        'symbol': listing.symbol,
+                        'name': listing.name,
+                        'exchange': listing.exchange
+                    })
                 
                 results['total_processed'] += 1
                 
-                if len(listings_to_update) >= batch_size:
-                    Listing.objects.bulk_update(listings_to_update, ['asset_type'])
-                    listings_to_update = []
-                
             except Exception as e:
                 error_msg = f"Error classifying {listing.symbol}: {e}"
                 results['errors'].append(error_msg)
                 logger.error(error_msg)
+
+    def classify_frame(self, df: pd.DataFrame) -> pd.Series:
+        """Vectorized classify_listing (without the API) over 'symbol'/'name' columns."""
+        tail = df['symbol'].str.upper().str.rpartition('.')
+        symbol_types = tail[2].where(tail[1] != '').map(self._suffix_map)
+        
+        # First matching category in priority order, scanned column-wise
+        names = df['name'].str.upper()
+        name_types = pd.Series(None, index=df.index, dtype=object)
+        for asset_type, pattern in self._name_categories:
+            unmatched = name_types.isna()
+            if not unmatched.any():
+                break
+            hits = names[unmatched].str.contains(pattern, na=False)
+            name_types[hits[hits].index] = asset_type
+        
+        conclusive_symbol = symbol_types.notna() & (symbol_types != 'OTHER')
+        return (
+            symbol_types.where(conclusive_symbol)
+            .fillna(name_types)
+            .fillna(symbol_types)
+            .fillna('STOCK')
+        )
+
+    def classify_all_listings_vectorized(self, limit: int = None, batch_size: int = 500) -> Dict:
+        """Classify every listing in one pandas pass (no API lookups).
+        
+        Returns the same result structure as classify_all_listings.
+        """
+        queryset = Listing.objects.order_by('pk').values_list('id', 'symbol', 'name', 'exchange')
+        if limit:
+            queryset = queryset[:limit]
+        
+        df = pd.DataFrame(list(queryset), columns=['id', 'symbol', 'name', 'exchange'])
+        results = {
+            'total_processed': len(df),
+            'counts': Counter(),
+            'samples': defaultdict(list),
+            'errors': []
+        }
+        if df.empty:
+            return results
+        
+        df['asset_type'] = self.classify_frame(df)
+        
+        with transaction.atomic():
+            Listing.objects.bulk_update(
+                [Listing(id=pk, asset_type=asset_type)
+                 for pk, asset_type in zip(df['id'], df['asset_type'])],
+                ['asset_type'],
+                batch_size=batch_size,
+            )
         
-        if listings_to_update:
-            Listing.objects.bulk_update(listings_to_update, ['asset_type'])
+        results['counts'].update(df['asset_type'].value_counts().to_dict())
+        samples = df.groupby('asset_type', sort=False).head(self.SAMPLES_PER_TYPE)
+        for asset_type, group in samples.groupby('asset_type', sort=False):
+            results['samples'][asset_type] = group[['symbol', 'name', 'exchange']].to_dict('records')
         
         return results
 
@@ -334,12 +464,13 @@ def demo_classification():
         results = classifier.classify_all_listings(limit=20, use_api=False)
         
         print(f"\n📈 Results (Processed {results['total_processed']} items):")
-        for asset_type, items in results['classifications'].items():
-            print(f"\n{asset_type} ({len(items)} items):")
+        for asset_type, count in results['counts'].most_common():
+            items = results['samples'][asset_type]
+            print(f"\n{asset_type} ({count} items):")
             for item in items[:5]:  # Show first 5 of each type
                 print(f"  • {item['symbol']} - {item['name'][:40]}")
-            if len(items) > 5:
-                print(f"  ... and {len(items) - 5} more")
+            if count > 5:
+                print(f"  ... and {count - 5} more")
                 
         if results['errors']:
             print(f"\n❌ Errors ({len(results['errors'])}):")
@@ -0,0 +1,39 @@
+# Partial/functional indexes for the Airflow enrichment batch-start queries.
+# Superseded: symbols are stored uppercased since 0016 and the queries no longer
+# use UPPER(symbol); all three indexes are dropped again in 0018 and 0019.
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('stocks', '0014_intradayprice_historicalprice'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_etd_404
+                ON enriched_ticker_data ((UPPER(symbol)))
+                WHERE fetch_errors::text LIKE '%404_NOT_FOUND%';
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS idx_etd_404;",
+        ),
+        migrations.RunSQL(
+            sql="""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_etd_hq_recent
+                ON enriched_ticker_data ((UPPER(symbol)), last_checked_at)
+                WHERE data_quality_score >= 0.8;
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS idx_etd_hq_recent;",
+        ),
+        migrations.RunSQL(
+            sql="""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_etd_upper_symbol_version
+                ON enriched_ticker_data ((UPPER(symbol)), version DESC);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS idx_etd_upper_symbol_version;",
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Store enriched ticker symbols uppercased so the Airflow queries can match on
+# the plain (symbol, version) indexes instead of wrapping every predicate in UPPER().
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stocks', '0015_enriched_ticker_data_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            # Mixed-case duplicates ('abc' v1 and 'ABC' v1) would collide on
+            # (symbol, version), so their histories are merged and renumbered
+            # in change order. Negative versions keep the intermediate rows
+            # clear of the existing ones until the final flip.
+            sql="""
+                WITH renumbered AS (
+                    SELECT e.id, ROW_NUMBER() OVER (
+                        PARTITION BY UPPER(e.symbol)
+                        ORDER BY e.data_changed_at, e.version, e.id
+                    ) AS new_version
+                    FROM enriched_ticker_data e
+                    WHERE UPPER(e.symbol) IN (
+                        SELECT UPPER(symbol) FROM enriched_ticker_data
+                        WHERE symbol <> UPPER(symbol)
+                    )
+                )
+                UPDATE enriched_ticker_data e
+                SET symbol = UPPER(e.symbol), version = -r.new_version
+                FROM renumbered r
+                WHERE e.id = r.id;
+
+                UPDATE enriched_ticker_data
+                SET version = -version
+                WHERE version < 0;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='enrichedtickerdata',
+            constraint=models.CheckConstraint(check=models.Q(('symbol', django.db.models.functions.text.Upper('symbol'))), name='enriched_symbol_upper'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Partial index for the postgres_utils stale-ticker anti-join, which probes for a
+# successfully checked row per symbol inside the freshness window.
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('stocks', '0016_enriched_ticker_data_symbol_upper'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_etd_fresh_ok
+                ON enriched_ticker_data (symbol, last_checked_at)
+                WHERE fetch_success;
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS idx_etd_fresh_ok;",
+        ),
+    ]
@@ -0,0 +1,32 @@
+# idx_etd_404 and idx_etd_hq_recent from 0015 are never used: the enrichment
+# stale-ticker query reduces the whole table with DISTINCT ON and a window, and
+# its quality threshold is a bound parameter, so neither partial index applies.
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # DROP INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('stocks', '0017_enriched_ticker_data_fresh_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="DROP INDEX CONCURRENTLY IF EXISTS idx_etd_404;",
+            reverse_sql="""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_etd_404
+                ON enriched_ticker_data ((UPPER(symbol)))
+                WHERE fetch_errors::text LIKE '%404_NOT_FOUND%';
+            """,
+        ),
+        migrations.RunSQL(
+            sql="DROP INDEX CONCURRENTLY IF EXISTS idx_etd_hq_recent;",
+            reverse_sql="""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_etd_hq_recent
+                ON enriched_ticker_data ((UPPER(symbol)), last_checked_at)
+                WHERE data_quality_score >= 0.8;
+            """,
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Symbols are stored uppercased since 0016 and no query on enriched_ticker_data
+# wraps symbol in UPPER() any more, so the functional index from 0015 is unused;
+# lookups are served by the (symbol, -version) model index it duplicated.
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # DROP INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('stocks', '0018_drop_enriched_ticker_data_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="DROP INDEX CONCURRENTLY IF EXISTS idx_etd_upper_symbol_version;",
+            reverse_sql="""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_etd_upper_symbol_version
+                ON enriched_ticker_data ((UPPER(symbol)), version DESC);
+            """,
+        ),
+    ]
@@ -1,5 +1,6 @@
 from decimal import Decimal
 from django.db import models
+from django.db.models.functions import Upper
 
 
 class Stock(models.Model):
@@ -708,6 +709,12 @@ class EnrichedTickerData(models.Model):
             models.Index(fields=["last_checked_at"]),  # DAG processing
             models.Index(fields=["data_hash"]),  # Change detection
         ]
+        constraints = [
+            # Symbols are stored uppercased so lookups can use the plain symbol index
+            models.CheckConstraint(
+                check=models.Q(symbol=Upper("symbol")), name="enriched_symbol_upper"
+            ),
+        ]
         verbose_name = "Enriched Ticker Data"
         verbose_name_plural = "Enriched Ticker Data"
 
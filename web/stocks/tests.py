@@ -1,4 +1,6 @@
 from decimal import Decimal
+from unittest.mock import patch
+import pandas as pd
 from django.test import TestCase, Client
 from django.urls import reverse
 from rest_framework.test import APIClient
@@ -105,6 +107,22 @@ class AssetClassifierTest(TestCase):
         result = self.classifier.classify_listing(listing)
         self.assertEqual(result, 'PREFERRED')
 
+    def test_name_categories_keep_priority_order(self):
+        self.assertEqual(self.classifier.classify_by_name('Bitcoin Fund A CAD'), 'CRYPTO')
+        self.assertEqual(self.classifier.classify_by_name('Global Equity Trust ETF'), 'ETF')
+        self.assertEqual(self.classifier.classify_by_name('Royalty Trust'), 'TRUST')
+        self.assertEqual(self.classifier.classify_by_name('Shopify Inc.'), 'STOCK')
+
+    def test_compiled_categories_are_shared_between_instances(self):
+        self.assertIs(AssetClassifier()._name_categories, self.classifier._name_categories)
+
+    def test_api_classification_is_cached(self):
+        cache.delete('asset_classifier:api:TSX:XIU')
+        with patch.object(AssetClassifier, '_fetch_api_classification', return_value='ETF') as fetch:
+            self.assertEqual(self.classifier.classify_by_api('XIU', 'TSX'), 'ETF')
+            self.assertEqual(self.classifier.classify_by_api('XIU', 'TSX'), 'ETF')
+        fetch.assert_called_once_with('XIU', 'TSX')
+
 
 # ── Serializer tests ──────────────────────────────────────────────────────────
 
@@ -379,6 +397,47 @@ class AssetClassifierBulkUpdateTest(TestCase):
         etf_count = Listing.objects.filter(asset_type='ETF').count()
         self.assertGreater(etf_count, 0)
 
+    def test_classify_all_listings_keeps_bounded_samples(self):
+        classifier = AssetClassifier()
+        for i in range(AssetClassifier.SAMPLES_PER_TYPE + 5):
+            ListingFactory(symbol=f'SAMP{i}', name=f'Sample ETF {i}', exchange='TSX')
+
+        results = classifier.classify_all_listings()
+        self.assertEqual(results['counts']['ETF'], AssetClassifier.SAMPLES_PER_TYPE + 5)
+        self.assertEqual(len(results['samples']['ETF']), AssetClassifier.SAMPLES_PER_TYPE)
+
+    def test_classify_all_listings_prefetches_api_only_when_needed(self):
+        classifier = AssetClassifier()
+        ListingFactory(symbol='APIA', name='Plain Holdings', exchange='TSX')
+        ListingFactory(symbol='APIB.WT', name='Plain Holdings Warrant', exchange='TSX')
+
+        with patch.object(AssetClassifier, 'classify_by_api', return_value='ETF') as api:
+            classifier.classify_all_listings(use_api=True)
+
+        # The warrant is settled by its symbol suffix, so only one lookup is made
+        api.assert_called_once_with('APIA', 'TSX')
+        self.assertEqual(Listing.objects.get(symbol='APIA').asset_type, 'ETF')
+        self.assertEqual(Listing.objects.get(symbol='APIB.WT').asset_type, 'WARRANT')
+
+    def test_vectorized_matches_per_listing_classification(self):
+        classifier = AssetClassifier()
+        ListingFactory(symbol='VEC', name='Plain Holdings', exchange='TSX')
+        ListingFactory(symbol='VECA.WT', name='Plain Holdings Warrant', exchange='TSX')
+        ListingFactory(symbol='VECB', name='Vector Bond ETF', exchange='TSX')
+
+        results = classifier.classify_all_listings_vectorized()
+
+        self.assertEqual(results['total_processed'], Listing.objects.count())
+        for listing in Listing.objects.all():
+            self.assertEqual(listing.asset_type, classifier.classify_listing(listing))
+
+        unnamed = [Listing(symbol='NONAME', name=None), Listing(symbol='NONAME.WT', name=None)]
+        frame = pd.DataFrame({'symbol': [listing.symbol for listing in unnamed], 'name': [None, None]})
+        self.assertEqual(
+            list(classifier.classify_frame(frame)),
+            [classifier.classify_listing(listing) for listing in unnamed],
+        )
+
 
 class CacheInvalidationTest(TestCase):
     def test_invalidate_asset_type_summary_cache(self):